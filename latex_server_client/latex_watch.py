@@ -9,17 +9,26 @@ Supports .latexignore files using gitignore syntax.
 """
 
 import argparse
+import codecs
+import gzip
+import hashlib
+import json
 import logging
 import os
+import queue
 import base64
 import sys
-import time
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Optional, Union
 
 import requests
 from watchdog.events import FileSystemEvent, FileSystemEventHandler
 from watchdog.observers import Observer
+from watchdog.observers.api import BaseObserver
+from watchdog.observers.polling import PollingObserver
 
 try:
     import pathspec
@@ -35,6 +44,128 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Maximum number of memoized ignore decisions kept by LatexWatcher
+IGNORE_CACHE_SIZE = 8192
+
+# Number of leading bytes inspected to tell text from binary files
+SNIFF_SIZE = 512
+
+# Lowest inotify watch limit considered sufficient for a LaTeX project
+INOTIFY_MIN_WATCHES = 8192
+INOTIFY_MAX_WATCHES_FILE = "/proc/sys/fs/inotify/max_user_watches"
+
+# Number of base64 characters decoded at a time when saving the PDF
+DECODE_CHUNK_SIZE = 1 << 20
+
+# gzip level used for compressed request bodies
+COMPRESS_LEVEL = 6
+
+# Number of threads used to read files when (re-)indexing a directory
+READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Seconds stop() waits for a running compilation before leaving it behind
+STOP_TIMEOUT = 5.0
+
+
+def _looks_binary(head: bytes) -> bool:
+    """
+    Guess whether a file is binary from its first bytes.
+
+    Args:
+        head: First bytes of the file
+
+    Returns:
+        True if the bytes contain a NUL byte or are not valid UTF-8
+    """
+    if b"\x00" in head:
+        return True
+
+    try:
+        # The prefix may end in the middle of a multi-byte character
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+    except UnicodeDecodeError:
+        return True
+
+    return False
+
+
+def _encode_entry(raw: bytes) -> dict[str, Any]:
+    """
+    Turn raw file content into a payload entry.
+
+    Args:
+        raw: File content
+
+    Returns:
+        Entry with the decoded text, or the base64 encoded data for binary files
+    """
+    # Decide text vs binary from the first bytes, so binary files are never
+    # decoded as a whole
+    if not _looks_binary(raw[:SNIFF_SIZE]):
+        try:
+            text = raw.decode("utf-8")
+        except UnicodeDecodeError:
+            # Invalid UTF-8 past the sniffed prefix → binary after all
+            pass
+        else:
+            # Normalize newlines, as reading in text mode would
+            if "\r" in text:
+                text = text.replace("\r\n", "\n").replace("\r", "\n")
+            return {"data": text, "binary": False}
+
+    return {"data": base64.b64encode(raw).decode("ascii"), "binary": True}
+
+
+def _encode_payload(files: dict[str, Any]) -> bytes:
+    """
+    Serialize the compilation request as compact UTF-8 JSON.
+
+    Unlike the default JSON encoding of requests, this drops the whitespace
+    after separators and keeps non-ASCII text as UTF-8 instead of \\uXXXX escapes.
+
+    Args:
+        files: Payload returned by LatexWatcher._collect_files
+
+    Returns:
+        Request body
+    """
+    return json.dumps(files, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _write_base64(data: str, path: Path, chunk_size: int = DECODE_CHUNK_SIZE) -> None:
+    """
+    Decode base64 data to a file chunk by chunk.
+
+    This avoids holding the whole decoded file in memory next to its encoded form.
+    The data is decoded into a temporary file next to the destination, which then
+    replaces it, so a decoding error never leaves a truncated file behind.
+
+    Args:
+        data: Base64 encoded content
+        path: Destination file
+        chunk_size: Number of base64 characters decoded at a time (multiple of 4)
+
+    Raises:
+        ValueError: If chunk_size is not a positive multiple of 4
+    """
+    if chunk_size <= 0 or chunk_size % 4:
+        raise ValueError(f"chunk_size must be a positive multiple of 4, got {chunk_size}")
+
+    # Chunks must start on 4-character boundaries, so drop line breaks first
+    if "\n" in data:
+        data = "".join(data.split())
+
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            for start in range(0, len(data), chunk_size):
+                f.write(base64.b64decode(data[start : start + chunk_size]))
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
 
 class LatexIgnore:
     """Handles .latexignore file parsing and matching using gitignore syntax."""
@@ -48,6 +179,9 @@ class LatexIgnore:
         """
         self.root_dir = root_dir
         self.spec: Optional[pathspec.PathSpec] = None
+        # Ignore decisions memoized by the watcher (path string → ignored); they
+        # are dropped together with these rules when .latexignore is reloaded
+        self.decisions: dict[str, bool] = {}
         self._load_ignore_file()
 
     def _load_ignore_file(self) -> None:
@@ -107,6 +241,8 @@ class LatexWatcher(FileSystemEventHandler):
         root_dir: Path,
         server_url: str,
         debounce_seconds: float = 1.0,
+        session: Optional[requests.Session] = None,
+        compress: bool = False,
     ) -> None:
         """
         Initialize the watcher.
@@ -116,42 +252,116 @@ class LatexWatcher(FileSystemEventHandler):
             root_dir: Root directory to watch
             server_url: URL of the compilation server
             debounce_seconds: Time to wait before triggering compilation
+            session: HTTP session to reuse for compilation requests
+            compress: Send gzip-compressed request bodies (the server must accept them)
         """
         super().__init__()
         self.main_file = main_file
         self.root_dir = root_dir
         self.server_url = server_url
         self.debounce_seconds = debounce_seconds
+        self.compress = compress
+        self._output_pdf = root_dir / f"{main_file.stem}.pdf"
+        self._output_pdf_str = str(self._output_pdf)
+
+        # Keep-alive connection to the server, reused across compilations
+        self._session = session if session is not None else requests.Session()
         self.ignore_handler = LatexIgnore(root_dir)
 
-        self._pending_compile = False
-        self._last_event_time = 0.0
         self._compiling = False
 
-        # Common patterns to always ignore
-        self._always_ignore = {
-            ".git",
-            ".svn",
-            "__pycache__",
-            ".DS_Store",
-            "*.aux",
-            "*.log",
-            "*.out",
-            "*.toc",
-            "*.bbl",
-            "*.blg",
-            "*.fdb_latexmk",
-            "*.fls",
-            "*.synctex.gz",
-            "*.pdf",  # Don't watch generated PDFs
-        }
+        # SHA-256 of the request body and index version of the last successful
+        # compilation
+        self._sent_digest: Optional[str] = None
+        self._sent_version: Optional[int] = None
+
+        # Debounce timer, re-armed on every relevant file system event
+        # (the lock also guards the set of dirty paths)
+        self._timer: Optional[threading.Timer] = None
+        self._timer_lock = threading.Lock()
+
+        # Directory (and file) names that are always ignored wherever they appear
+        self._ignore_dirs = frozenset({".git", ".svn", "__pycache__", ".DS_Store"})
+
+        # File suffixes that are always ignored (LaTeX build artifacts)
+        self._ignore_suffixes = frozenset(
+            {
+                ".aux",
+                ".log",
+                ".out",
+                ".toc",
+                ".bbl",
+                ".blg",
+                ".fdb_latexmk",
+                ".fls",
+                ".pdf",  # Don't watch generated PDFs
+            }
+        )
+
+        # In-memory index of the project files (relative path → payload entry),
+        # built by start() and kept up to date by the file system events
+        self._main_rel = str(main_file.relative_to(root_dir))
+        self._file_cache: dict[str, dict[str, Any]] = {}
+        # (mtime_ns, size) of each indexed file, to skip re-reading unchanged files
+        self._file_stamps: dict[str, tuple[int, int]] = {}
+        self._index_lock = threading.Lock()
+        # Incremented whenever the indexed content changes
+        self._index_version = 0
+
+        # Paths changed since the last compilation, applied to the index by the
+        # compile worker
+        self._dirty: set[Path] = set()
+
+        # Compilations run on a dedicated worker thread, so neither the watchdog
+        # thread nor the debounce timer ever wait on the server; at most one
+        # request is queued while a compilation is running
+        self._compile_queue: queue.Queue[bool] = queue.Queue(maxsize=1)
+        # Set by stop(); pending requests are dropped once it is set
+        self._stopping = threading.Event()
+        self._worker = threading.Thread(
+            target=self._compile_worker, name="latex-compile", daemon=True
+        )
+
+    def start(self) -> None:
+        """
+        Build the file index and start the compile worker thread.
+
+        Call this after the observer has been started: changes made while the
+        tree is indexed are then queued as events instead of being lost.
+        """
+        self._reindex_tree(self.root_dir)
+        self._worker.start()
 
     def _should_ignore_path(self, path: Path) -> bool:
+        """
+        Check if a path should be ignored, using cached decisions when available.
+
+        Args:
+            path: Path to check
+
+        Returns:
+            True if the path should be ignored
+        """
+        # Use one set of rules throughout, so that a decision made with rules
+        # replaced meanwhile never ends up in the cache of the new ones
+        ignore_handler = self.ignore_handler
+        cache = ignore_handler.decisions
+
+        key = str(path)
+        ignored = cache.get(key)
+        if ignored is None:
+            if len(cache) >= IGNORE_CACHE_SIZE:
+                cache.clear()
+            ignored = cache[key] = self._should_ignore_path_uncached(path, ignore_handler)
+        return ignored
+
+    def _should_ignore_path_uncached(self, path: Path, ignore_handler: LatexIgnore) -> bool:
         """
         Check if a path should be ignored.
 
         Args:
             path: Path to check
+            ignore_handler: .latexignore rules to apply
 
         Returns:
             True if the path should be ignored
@@ -160,90 +370,228 @@ class LatexWatcher(FileSystemEventHandler):
         if path.name.startswith(".") or path.name.endswith("~"):
             return True
 
-        # Check always-ignore patterns
-        for pattern in self._always_ignore:
-            if pattern.startswith("*."):
-                # Check extension
-                if path.suffix == pattern[1:]:
-                    return True
-            elif pattern in path.parts:
-                return True
+        # Check always-ignore suffixes
+        if path.suffix in self._ignore_suffixes or path.name.endswith(".synctex.gz"):
+            return True
+
+        # Check always-ignore directories, only below the root directory so that
+        # the location of the project itself does not matter
+        try:
+            parts = path.relative_to(self.root_dir).parts
+        except ValueError:
+            parts = path.parts
+        if not self._ignore_dirs.isdisjoint(parts):
+            return True
 
         # Check .latexignore
-        if self.ignore_handler.should_ignore(path):
+        if ignore_handler.should_ignore(path):
             logger.debug(f"Ignored by .latexignore: {path}")
             return True
 
         return False
 
-    def _collect_files(self) -> Dict[str, Any]:
-        """
-        Collect all files in the directory that should be sent.
-        Returns a dictionary mapping paths to file contents.
-        Supports both text and binary files (binary as base64).
+    def _read_file(self, file_path: Path) -> Optional[dict[str, Any]]:
         """
-        files = {}
+        Read a single file into a payload entry.
 
-        # Read main file (always text)
+        Args:
+            file_path: Path of the file to read
+
+        Returns:
+            Entry with the file data (binary files as base64), or None on error
+        """
         try:
-            with open(self.main_file, "r", encoding="utf-8") as f:
-                files["main"] = f.read()
-            logger.debug(f"Read main file: {self.main_file}")
+            with open(file_path, "rb") as f:
+                raw = f.read()
         except Exception as e:
-            logger.error(f"Error reading main file: {e}")
-            return {}
+            logger.warning(f"Error reading {file_path}: {e}")
+            return None
 
-        # Add other files dictionary
-        files["files"] = {}
+        return _encode_entry(raw)
 
-        # Collect all other files
-        for file_path in self.root_dir.rglob("*"):
-            if not file_path.is_file():
-                continue
+    def _index_file(self, file_path: Path) -> Optional[str]:
+        """
+        Update the in-memory index entry of a single file.
 
-            # Skip the main file
-            if file_path == self.main_file:
-                continue
+        The file is only re-read (and re-encoded) when its modification time or
+        size changed since it was last indexed. The entry is dropped if the file
+        can no longer be read.
 
-            # Check ignore patterns
-            if self._should_ignore_path(file_path):
-                continue
+        Args:
+            file_path: Path of the file to (re-)index
 
-            rel_path = file_path.relative_to(self.root_dir)
+        Returns:
+            Relative path of the file if it is indexed, None otherwise
+        """
+        try:
+            rel_path = str(file_path.relative_to(self.root_dir))
+            st = file_path.stat()
+        except (ValueError, OSError):
+            self._unindex_path(file_path)
+            return None
+
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._index_lock:
+            if rel_path in self._file_cache and self._file_stamps.get(rel_path) == stamp:
+                return rel_path
+
+        entry = self._read_file(file_path)
+
+        with self._index_lock:
+            if entry is None:
+                if self._file_cache.pop(rel_path, None) is not None:
+                    self._index_version += 1
+                self._file_stamps.pop(rel_path, None)
+                return None
+
+            # Saving a file without changing it only refreshes its stamp
+            if self._file_cache.get(rel_path) != entry:
+                self._file_cache[rel_path] = entry
+                self._index_version += 1
+            self._file_stamps[rel_path] = stamp
+
+        logger.debug(f"Indexed {'binary' if entry['binary'] else 'text'} file: {rel_path}")
+        return rel_path
+
+    def _walk(self, directory: Union[str, Path]) -> Iterator[os.DirEntry[str]]:
+        """
+        Recursively yield the regular files below a directory.
 
-            # Try to read as UTF-8
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    files["files"][str(rel_path)] = {
-                        "data": f.read(),
-                        "binary": False
-                    }
-                    logger.debug(f"Added text file: {rel_path}")
-                continue
+        Always-ignored directories (.git, __pycache__, ...) are pruned without
+        being descended into; symlinked directories are not followed.
 
-            except UnicodeDecodeError:
-                # Binary file → read raw and encode
-                try:
-                    with open(file_path, "rb") as f:
-                        raw = f.read()
-                        b64 = base64.b64encode(raw).decode("ascii")
+        Args:
+            directory: Directory to walk
 
-                        files["files"][str(rel_path)] = {
-                            "data": b64,
-                            "binary": True
-                        }
+        Yields:
+            Directory entries of the files found
+        """
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in self._ignore_dirs:
+                            yield from self._walk(entry.path)
+                    elif entry.is_file():
+                        yield entry
+        except OSError as e:
+            logger.warning(f"Error scanning {directory}: {e}")
+
+    def _index_tree(self, directory: Path) -> set[str]:
+        """
+        Add every non-ignored file below a directory to the index.
 
-                        logger.debug(f"Added binary file: {rel_path}")
+        Args:
+            directory: Directory to walk
 
-                except Exception as e:
-                    logger.warning(f"Error reading binary {file_path}: {e}")
-                    continue
+        Returns:
+            Relative paths of the indexed files
+        """
+        file_paths = []
+        for entry in self._walk(directory):
+            file_path = Path(entry.path)
 
-            except Exception as e:
-                logger.warning(f"Error reading {file_path}: {e}")
+            # The main file is always part of the index
+            if file_path != self.main_file and self._should_ignore_path(file_path):
                 continue
 
-        return files
+            file_paths.append(file_path)
+
+        # Reading is I/O bound, so overlap it across a few threads
+        with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+            results = executor.map(self._index_file, file_paths)
+            return {rel_path for rel_path in results if rel_path is not None}
+
+    def _reindex_tree(self, directory: Path) -> None:
+        """
+        Re-index every file below a directory.
+
+        Entries of files that are no longer present (or now ignored) are dropped,
+        unchanged files keep their cached entry.
+
+        Args:
+            directory: Directory to re-index (the root directory for a full rebuild)
+        """
+        try:
+            rel_dir = directory.relative_to(self.root_dir)
+        except ValueError:
+            return
+
+        indexed = self._index_tree(directory)
+        prefix = "" if rel_dir == Path(".") else str(rel_dir) + os.sep
+
+        with self._index_lock:
+            stale = [
+                key for key in self._file_cache if key.startswith(prefix) and key not in indexed
+            ]
+            for rel_path in stale:
+                del self._file_cache[rel_path]
+                self._file_stamps.pop(rel_path, None)
+            if stale:
+                self._index_version += 1
+
+        logger.debug(f"Indexed {len(indexed)} file(s) in {directory}")
+
+    def _refresh_path(self, path: Path) -> None:
+        """
+        Bring the index in line with the current state of a changed path.
+
+        Args:
+            path: Changed file or directory
+        """
+        if path.is_dir():
+            self._reindex_tree(path)
+        elif path.is_file() and (path == self.main_file or not self._should_ignore_path(path)):
+            self._index_file(path)
+        else:
+            self._unindex_path(path)
+
+    def _unindex_path(self, path: Path) -> bool:
+        """
+        Remove a file, or every file below a directory, from the index.
+
+        Args:
+            path: Path of the removed file or directory
+
+        Returns:
+            True if at least one indexed file was removed
+        """
+        try:
+            rel_path = str(path.relative_to(self.root_dir))
+        except ValueError:
+            return False
+
+        prefix = rel_path + os.sep
+        with self._index_lock:
+            removed = [key for key in self._file_cache if key == rel_path or key.startswith(prefix)]
+            for key in removed:
+                del self._file_cache[key]
+                self._file_stamps.pop(key, None)
+            if removed:
+                self._index_version += 1
+
+        return bool(removed)
+
+    def _collect_files(self) -> dict[str, Any]:
+        """
+        Collect all files in the directory that should be sent.
+        Returns a dictionary mapping paths to file contents.
+        Supports both text and binary files (binary as base64).
+        """
+        with self._index_lock:
+            main = self._file_cache.get(self._main_rel)
+            if main is None or main["binary"]:
+                logger.error(f"Error reading main file: {self.main_file}")
+                return {}
+
+            return {
+                "main": main["data"],
+                "files": {
+                    rel_path: entry
+                    for rel_path, entry in self._file_cache.items()
+                    if rel_path != self._main_rel
+                },
+            }
 
     def _compile(self) -> None:
         """Send files to the compilation server."""
@@ -252,22 +600,40 @@ class LatexWatcher(FileSystemEventHandler):
             return
 
         self._compiling = True
-        self._pending_compile = False
 
         try:
             logger.info("Collecting files...")
+            version = self._index_version
             files = self._collect_files()
 
             if not files:
                 logger.error("No files to compile")
                 return
 
-            logger.info(f"Sending {len(files)} file(s) to server...")
+            body = _encode_payload(files)
+
+            # Skip the upload if nothing changed since the last successful compilation
+            digest = hashlib.sha256(body).hexdigest()
+            if digest == self._sent_digest and self._output_pdf.exists():
+                logger.info("No changes since last compilation, skipping")
+                self._sent_version = version
+                return
+
+            headers = {"Content-Type": "application/json"}
+            if self.compress:
+                # LaTeX sources compress well; already compressed figures cost little
+                size = len(body)
+                body = gzip.compress(body, compresslevel=COMPRESS_LEVEL)
+                headers["Content-Encoding"] = "gzip"
+                logger.debug(f"Compressed request body from {size} to {len(body)} bytes")
+
+            logger.info(f"Sending {len(files['files']) + 1} file(s) to server...")
 
             # Send compilation request
-            response = requests.post(
+            response = self._session.post(
                 f"{self.server_url}/compile",
-                json=files,
+                data=body,
+                headers=headers,
                 timeout=120,  # 2 minute timeout
             )
 
@@ -277,21 +643,19 @@ class LatexWatcher(FileSystemEventHandler):
                 # Check if PDF was generated
                 if result.get("file"):
                     # Save PDF to disk
-                    import base64
-
-                    pdf_bytes = base64.b64decode(result["file"])
-                    output_file = self.root_dir / f"{self.main_file.stem}.pdf"
+                    _write_base64(result["file"], self._output_pdf)
 
-                    with open(output_file, "wb") as f:
-                        f.write(pdf_bytes)
+                    self._sent_digest = digest
+                    self._sent_version = version
 
-                    logger.info(f"✓ Compilation successful! PDF saved to: {output_file}")
+                    logger.info(f"✓ Compilation successful! PDF saved to: {self._output_pdf}")
                 else:
                     logger.error("✗ Compilation failed - no PDF generated")
-                    # Show last 10 lines of log
-                    log_lines = result.get("log", "").split("\n")
+                    # Show the errors among the last 20 lines of the log, without
+                    # splitting the whole (possibly long) log
+                    log_lines = result.get("log", "").rsplit("\n", 20)[-20:]
                     relevant_lines = [
-                        line for line in log_lines[-20:] if line.strip() and "error" in line.lower()
+                        line for line in log_lines if line.strip() and "error" in line.lower()
                     ]
                     if relevant_lines:
                         logger.error("Recent errors:")
@@ -312,38 +676,175 @@ class LatexWatcher(FileSystemEventHandler):
         finally:
             self._compiling = False
 
+    def _schedule_compile(self) -> None:
+        """(Re)start the debounce timer that triggers the compilation."""
+        with self._timer_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+
+            self._timer = threading.Timer(self.debounce_seconds, self._flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _apply_changes(self) -> bool:
+        """
+        Apply the paths changed since the last call to the file index.
+
+        Files whose modification time and size are unchanged are not re-read,
+        and re-read files with identical content leave the index untouched, so
+        saves without changes do not lead to a compilation. After a failed
+        compilation any save triggers a new attempt.
+
+        Returns:
+            True if the indexed content differs from the last successful compilation
+        """
+        with self._timer_lock:
+            dirty, self._dirty = self._dirty, set()
+
+        # A full re-index with the reloaded ignore rules covers every other change
+        if self.root_dir in dirty:
+            logger.info("Reloading .latexignore")
+            self.ignore_handler = LatexIgnore(self.root_dir)
+            dirty = {self.root_dir}
+
+        if not dirty:
+            return False
+
+        for path in dirty:
+            # One failing path must not drop the changes to the others
+            try:
+                self._refresh_path(path)
+            except Exception as e:
+                logger.warning(f"Error updating index for {path}: {e}")
+
+        if self._index_version == self._sent_version:
+            logger.debug("No content changes, skipping compilation")
+            return False
+
+        return True
+
+    def _flush(self) -> None:
+        """Hand the pending changes over to the compile worker (debounce timer callback)."""
+        try:
+            self._compile_queue.put_nowait(True)
+        except queue.Full:
+            # The worker has not picked up the previous request yet
+            pass
+
+    def _compile_worker(self) -> None:
+        """Apply pending file changes and compile, one request at a time."""
+        # True requests a compilation, False stops the worker
+        while self._compile_queue.get() and not self._stopping.is_set():
+            try:
+                if self._apply_changes() and not self._stopping.is_set():
+                    self._compile()
+            except Exception:
+                logger.exception("Error while processing file changes")
+
+    def stop(self) -> None:
+        """Cancel any pending compilation and stop the compile worker thread."""
+        with self._timer_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        self._stopping.set()
+
+        if self._worker.is_alive():
+            # Drop a queued request instead of waiting for the worker to take it
+            try:
+                self._compile_queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self._compile_queue.put_nowait(False)
+            except queue.Full:
+                # A timer fired meanwhile; the worker sees the stop flag anyway
+                pass
+
+            self._worker.join(timeout=STOP_TIMEOUT)
+            if self._worker.is_alive():
+                logger.warning("Compilation still running, not waiting for it")
+
+    def _on_path_changed(self, path: Path) -> None:
+        """
+        Record a changed path and (re)start the debounce timer.
+
+        Args:
+            path: Created, modified, deleted or moved file or directory
+        """
+        # A .latexignore change re-indexes the whole tree; the rules themselves are
+        # reloaded on the compile worker, between index updates
+        if path == self.root_dir / ".latexignore":
+            path = self.root_dir
+
+        # Check if should be ignored
+        elif path != self.main_file and self._should_ignore_path(path):
+            return
+
+        logger.debug(f"Changed: {path}")
+
+        with self._timer_lock:
+            self._dirty.add(path)
+
+        self._schedule_compile()
+
     def on_modified(self, event: FileSystemEvent) -> None:
         """Handle file modification events."""
-        if event.is_directory:
+        src_path = os.fsdecode(event.src_path)
+
+        # Writing the output PDF is the most frequent self-inflicted event
+        if src_path == self._output_pdf_str or event.is_directory:
             return
 
-        path = Path(event.src_path)
+        self._on_path_changed(Path(src_path))
 
-        # Check if should be ignored
-        if self._should_ignore_path(path):
+    def on_created(self, event: FileSystemEvent) -> None:
+        """Handle file and directory creation events."""
+        src_path = os.fsdecode(event.src_path)
+        if src_path == self._output_pdf_str:
             return
 
-        logger.debug(f"File modified: {path}")
+        self._on_path_changed(Path(src_path))
 
-        # Mark compilation as pending
-        self._pending_compile = True
-        self._last_event_time = time.time()
+    def on_deleted(self, event: FileSystemEvent) -> None:
+        """Handle file and directory deletion events."""
+        self._on_path_changed(Path(os.fsdecode(event.src_path)))
 
-    def on_created(self, event: FileSystemEvent) -> None:
-        """Handle file creation events."""
-        self.on_modified(event)
+    def on_moved(self, event: FileSystemEvent) -> None:
+        """Handle file and directory move events."""
+        self._on_path_changed(Path(os.fsdecode(event.src_path)))
+        self._on_path_changed(Path(os.fsdecode(event.dest_path)))
 
-    def check_and_compile(self) -> None:
-        """Check if compilation should be triggered (debounced)."""
-        if not self._pending_compile:
-            return
 
-        # Check if enough time has passed since last event
-        if time.time() - self._last_event_time < self.debounce_seconds:
+def check_observer(observer: BaseObserver) -> None:
+    """
+    Report the file system observer backend and warn about slow setups.
+
+    Args:
+        observer: Observer that will watch the project directory
+    """
+    logger.debug(f"Observer backend: {type(observer).__name__}")
+
+    if isinstance(observer, PollingObserver):
+        logger.warning(
+            "No native file system notification backend available, falling back to "
+            "polling (higher CPU usage and latency)"
+        )
+        return
+
+    # A low inotify watch limit makes watchdog miss directories in large trees
+    if sys.platform.startswith("linux"):
+        try:
+            max_watches = int(Path(INOTIFY_MAX_WATCHES_FILE).read_text().strip())
+        except (OSError, ValueError):
             return
 
-        # Trigger compilation
-        self._compile()
+        if max_watches < INOTIFY_MIN_WATCHES:
+            logger.warning(
+                f"fs.inotify.max_user_watches is {max_watches}; changes may be missed in "
+                f"large projects (raise it with: sysctl fs.inotify.max_user_watches=524288)"
+            )
 
 
 def parse_args() -> argparse.Namespace:
@@ -394,6 +895,13 @@ def parse_args() -> argparse.Namespace:
         help="Compile immediately on start",
     )
 
+    parser.add_argument(
+        "--compress",
+        "-z",
+        action="store_true",
+        help="Send gzip-compressed requests (the server must accept Content-Encoding: gzip)",
+    )
+
     parser.add_argument(
         "--verbose",
         "-v",
@@ -448,10 +956,13 @@ def main() -> None:
         logger.error(f"Watch dir: {watch_dir}")
         sys.exit(1)
 
+    # Share one connection for the server check and the compilations
+    session = requests.Session()
+
     # Verify server is accessible
     try:
         logger.info(f"Checking server at {args.server}...")
-        response = requests.get(args.server, timeout=5)
+        response = session.get(args.server, timeout=5)
         if response.status_code == 200:
             logger.info("✓ Server is accessible")
         else:
@@ -468,35 +979,45 @@ def main() -> None:
     logger.info(f"Main file: {main_file.name}")
     logger.info(f"Server: {args.server}")
     logger.info(f"Debounce: {args.debounce}s")
+    if args.compress:
+        logger.info("Compression: gzip")
 
     watcher = LatexWatcher(
         main_file=main_file,
         root_dir=watch_dir,
         server_url=args.server,
         debounce_seconds=args.debounce,
+        session=session,
+        compress=args.compress,
     )
 
+    # Set up file system observer before indexing, so no change goes unnoticed
+    observer = Observer()
+    check_observer(observer)
+    observer.schedule(watcher, str(watch_dir), recursive=True)
+    observer.start()
+
+    watcher.start()
+
     # Compile on start if requested
     if args.compile_on_start:
         logger.info("Compiling on start...")
         watcher._compile()
 
-    # Set up file system observer
-    observer = Observer()
-    observer.schedule(watcher, str(watch_dir), recursive=True)
-    observer.start()
-
     logger.info("Watching for changes... (Press Ctrl+C to stop)")
 
     try:
-        while True:
-            time.sleep(0.1)
-            watcher.check_and_compile()
+        # Compilations are triggered by the debounce timer; the timeout only keeps
+        # the main thread responsive to Ctrl+C on platforms where join() is not
+        while observer.is_alive():
+            observer.join(timeout=1.0)
     except KeyboardInterrupt:
         logger.info("Stopping...")
         observer.stop()
+        observer.join()
+
+    watcher.stop()
 
-    observer.join()
     logger.info("Stopped")
 
 
@@ -4,7 +4,17 @@ Tests for the LaTeX watch functionality.
 Run with: pytest tests/test_watch.py -v
 """
 
+import base64
+import binascii
+import gc
+import gzip
+import json
+import os
+import shutil
 import tempfile
+import threading
+import time
+import weakref
 from pathlib import Path
 
 import pytest
@@ -194,6 +204,7 @@ class TestLatexWatcherHelpers:
             from latex_server_client.latex_watch import LatexWatcher
 
             watcher = LatexWatcher(main_file, root, "http://localhost:9080")
+            watcher.start()
 
             # Temporary files should be ignored
             assert watcher._should_ignore_path(root / ".hidden")
@@ -205,6 +216,7 @@ class TestLatexWatcherHelpers:
             # Normal files should not be ignored
             assert not watcher._should_ignore_path(root / "main.tex")
             assert not watcher._should_ignore_path(root / "refs.bib")
+            watcher.stop()
 
     def test_should_ignore_git_directory(self) -> None:
         """Test that .git directory is always ignored."""
@@ -216,10 +228,87 @@ class TestLatexWatcherHelpers:
             from latex_server_client.latex_watch import LatexWatcher
 
             watcher = LatexWatcher(main_file, root, "http://localhost:9080")
+            watcher.start()
 
             # .git files should be ignored
             assert watcher._should_ignore_path(root / ".git" / "config")
             assert watcher._should_ignore_path(root / ".git" / "HEAD")
+            watcher.stop()
+
+    def test_should_ignore_build_artifacts(self) -> None:
+        """Test that build artifacts and VCS/cache directories are always ignored."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            main_file = root / "main.tex"
+            main_file.write_text("")
+
+            from latex_server_client.latex_watch import LatexWatcher
+
+            watcher = LatexWatcher(main_file, root, "http://localhost:9080")
+            watcher.start()
+
+            assert watcher._should_ignore_path(root / "main.synctex.gz")
+            assert watcher._should_ignore_path(root / "chapters" / "ch1.fdb_latexmk")
+            assert watcher._should_ignore_path(root / "__pycache__" / "mod.pyc")
+            assert watcher._should_ignore_path(root / "sub" / ".svn" / "entries")
+
+            # Only the exact artifact suffixes are ignored
+            assert not watcher._should_ignore_path(root / "data.tar.gz")
+            assert not watcher._should_ignore_path(root / "figures" / "plot.png")
+            watcher.stop()
+
+    def test_ignored_directory_above_root(self) -> None:
+        """Test that ignored directory names above the root directory do not matter."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir) / "__pycache__" / "project"
+            root.mkdir(parents=True)
+            main_file = root / "main.tex"
+            main_file.write_text("main")
+            (root / "content.tex").write_text("content")
+
+            from latex_server_client.latex_watch import LatexWatcher
+
+            watcher = LatexWatcher(main_file, root, "http://localhost:9080")
+            watcher.start()
+
+            assert not watcher._should_ignore_path(root / "content.tex")
+            assert watcher._should_ignore_path(root / "__pycache__" / "content.tex")
+            assert "content.tex" in watcher._collect_files()["files"]
+            watcher.stop()
+
+    def test_latexignore_change_reloads_rules(self) -> None:
+        """Test that editing .latexignore invalidates cached ignore decisions."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            main_file = root / "main.tex"
+            main_file.write_text("")
+
+            from watchdog.events import FileModifiedEvent
+
+            from latex_server_client.latex_watch import LatexWatcher
+
+            watcher = LatexWatcher(main_file, root, "http://localhost:9080")
+            watcher.start()
+            watcher._schedule_compile = lambda: None  # type: ignore[method-assign]
+
+            notes = root / "notes.tex"
+            assert not watcher._should_ignore_path(notes)
+
+            ignore_file = root / ".latexignore"
+            ignore_file.write_text("notes.tex\n")
+            handler = watcher.ignore_handler
+            watcher.on_modified(FileModifiedEvent(str(ignore_file)))
+
+            # The rules are only reloaded when the changes are applied
+            assert watcher._dirty == {root}
+            assert watcher.ignore_handler is handler
+
+            watcher._apply_changes()
+
+            assert watcher._should_ignore_path(notes)
+            # Decisions made with the old rules stay with them
+            assert handler.decisions[str(notes)] is False
+            watcher.stop()
 
     def test_collect_files_basic(self) -> None:
         """Test basic file collection."""
@@ -236,6 +325,7 @@ class TestLatexWatcherHelpers:
             from latex_server_client.latex_watch import LatexWatcher
 
             watcher = LatexWatcher(main_file, root, "http://localhost:9080")
+            watcher.start()
 
             files = watcher._collect_files()
 
@@ -244,7 +334,385 @@ class TestLatexWatcherHelpers:
             assert "files" in files
             assert "content.tex" in files["files"]
             assert files["main"] == "\\documentclass{article}"
-            assert files["files"]["content.tex"] == "Hello world"
+            assert files["files"]["content.tex"] == {"data": "Hello world", "binary": False}
+            watcher.stop()
+
+    def test_file_index_follows_events(self) -> None:
+        """Test that the in-memory file index is updated by file system events."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            main_file = root / "main.tex"
+            main_file.write_text("main")
+
+            content_file = root / "content.tex"
+            content_file.write_text("old")
+
+            from watchdog.events import (
+                FileCreatedEvent,
+                FileDeletedEvent,
+                FileModifiedEvent,
+                FileMovedEvent,
+            )
+
+            from latex_server_client.latex_watch import LatexWatcher
+
+            watcher = LatexWatcher(main_file, root, "http://localhost:9080")
+            watcher.start()
+            watcher._schedule_compile = lambda: None  # type: ignore[method-assign]
+
+            # Modification
+            content_file.write_text("new")
+            watcher.on_modified(FileModifiedEvent(str(content_file)))
+            watcher._apply_changes()
+            assert watcher._collect_files()["files"]["content.tex"]["data"] == "new"
+
+            # Creation
+            extra_file = root / "extra.tex"
+            extra_file.write_text("extra")
+            watcher.on_created(FileCreatedEvent(str(extra_file)))
+            watcher._apply_changes()
+            assert "extra.tex" in watcher._collect_files()["files"]
+
+            # Move
+            moved_file = root / "moved.tex"
+            extra_file.rename(moved_file)
+            watcher.on_moved(FileMovedEvent(str(extra_file), str(moved_file)))
+            watcher._apply_changes()
+            files = watcher._collect_files()["files"]
+            assert "extra.tex" not in files
+            assert files["moved.tex"]["data"] == "extra"
+
+            # Deletion
+            content_file.unlink()
+            watcher.on_deleted(FileDeletedEvent(str(content_file)))
+            watcher._apply_changes()
+            assert "content.tex" not in watcher._collect_files()["files"]
+            watcher.stop()
+
+    def test_file_index_skips_unchanged_files(self) -> None:
+        """Test that files with unchanged mtime and size are not re-read."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            main_file = root / "main.tex"
+            main_file.write_text("main")
+
+            image_file = root / "image.png"
+            image_file.write_bytes(b"\x89PNG\r\n\x1a\n")
+
+            from watchdog.events import FileModifiedEvent
+
+            from latex_server_client.latex_watch import LatexWatcher
+
+            watcher = LatexWatcher(main_file, root, "http://localhost:9080")
+            watcher.start()
+            watcher._schedule_compile = lambda: None  # type: ignore[method-assign]
+
+            reads = []
+            read_file = watcher._read_file
+
+            def counting_read_file(file_path):
+                reads.append(file_path)
+                return read_file(file_path)
+
+            watcher._read_file = counting_read_file  # type: ignore[method-assign]
+
+            # Touch-less "modification" (e.g. editor autosave without changes)
+            watcher.on_modified(FileModifiedEvent(str(image_file)))
+            watcher._apply_changes()
+            assert reads == []
+
+            # Real modification
+            image_file.write_bytes(b"\x89PNG\r\n\x1a\n\xff")
+            watcher.on_modified(FileModifiedEvent(str(image_file)))
+            watcher._apply_changes()
+            assert reads == [image_file]
+            assert watcher._collect_files()["files"]["image.png"]["binary"]
+            watcher.stop()
+
+    def test_file_index_directory_removal(self) -> None:
+        """Test that deleting a directory drops all of its files from the index."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            main_file = root / "main.tex"
+            main_file.write_text("main")
+
+            chapters_dir = root / "chapters"
+            chapters_dir.mkdir()
+            (chapters_dir / "chapter1.tex").write_text("chapter 1")
+            (root / "chapters.tex").write_text("not in the directory")
+
+            from watchdog.events import DirDeletedEvent
+
+            from latex_server_client.latex_watch import LatexWatcher
+
+            watcher = LatexWatcher(main_file, root, "http://localhost:9080")
+            watcher.start()
+            watcher._schedule_compile = lambda: None  # type: ignore[method-assign]
+
+            shutil.rmtree(chapters_dir)
+            watcher.on_deleted(DirDeletedEvent(str(chapters_dir)))
+            watcher._apply_changes()
+
+            files = watcher._collect_files()["files"]
+            assert list(files) == ["chapters.tex"]
+            watcher.stop()
+
+    def test_events_are_debounced(self) -> None:
+        """Test that a burst of events triggers a single compilation."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            main_file = root / "main.tex"
+            main_file.write_text("main")
+
+            from watchdog.events import FileModifiedEvent
+
+            from latex_server_client.latex_watch import LatexWatcher
+
+            watcher = LatexWatcher(main_file, root, "http://localhost:9080", debounce_seconds=0.05)
+            watcher.start()
+
+            compiled = threading.Event()
+            compiles = []
+
+            def fake_compile():
+                compiles.append(time.monotonic())
+                compiled.set()
+
+            watcher._compile = fake_compile  # type: ignore[method-assign]
+
+            for i in range(5):
+                main_file.write_text(f"main {i}")
+                watcher.on_modified(FileModifiedEvent(str(main_file)))
+
+            assert compiled.wait(timeout=5)
+            time.sleep(0.2)
+            assert len(compiles) == 1
+            watcher.stop()
+
+    def test_ignored_changes_do_not_compile(self) -> None:
+        """Test that events for ignored files are not recorded as changes."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            main_file = root / "main.tex"
+            main_file.write_text("main")
+
+            from watchdog.events import FileCreatedEvent, FileModifiedEvent
+
+            from latex_server_client.latex_watch import LatexWatcher
+
+            watcher = LatexWatcher(main_file, root, "http://localhost:9080")
+            watcher.start()
+            watcher._schedule_compile = lambda: None  # type: ignore[method-assign]
+
+            watcher.on_modified(FileModifiedEvent(str(root / "main.aux")))
+            watcher.on_created(FileCreatedEvent(str(root / "notes.pdf")))
+            assert not watcher._apply_changes()
+
+            # The output PDF is skipped before the ignore rules are even consulted
+            watcher.on_created(FileCreatedEvent(str(root / "main.pdf")))
+            watcher.on_modified(FileModifiedEvent(str(root / "main.pdf")))
+            assert str(root / "main.pdf") not in watcher.ignore_handler.decisions
+            assert not watcher._dirty
+
+            # Repeated events for the same file are coalesced
+            main_file.write_text("main changed")
+            watcher.on_modified(FileModifiedEvent(str(main_file)))
+            watcher.on_modified(FileModifiedEvent(str(main_file)))
+            assert watcher._dirty == {main_file}
+            assert watcher._apply_changes()
+            assert not watcher._dirty
+            watcher.stop()
+
+    def test_unchanged_saves_do_not_compile(self, monkeypatch) -> None:
+        """Test that saving files without changing them does not trigger a compilation."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            main_file = root / "main.tex"
+            main_file.write_text("main")
+
+            from watchdog.events import FileModifiedEvent
+
+            from latex_server_client.latex_watch import LatexWatcher
+
+            watcher = LatexWatcher(main_file, root, "http://localhost:9080")
+            watcher.start()
+            watcher._schedule_compile = lambda: None  # type: ignore[method-assign]
+            monkeypatch.setattr(
+                watcher._session, "post", lambda url, **kwargs: FakeResponse(b"%PDF")
+            )
+            watcher._compile()
+
+            # Event without any change on disk
+            watcher.on_modified(FileModifiedEvent(str(main_file)))
+            assert not watcher._apply_changes()
+
+            # Rewritten with the same content (new modification time)
+            main_file.write_text("main")
+            os.utime(main_file, ns=(0, 0))
+            watcher.on_modified(FileModifiedEvent(str(main_file)))
+            assert not watcher._apply_changes()
+
+            # .latexignore changes that do not affect the indexed files
+            (root / ".latexignore").write_text("drafts/\n")
+            watcher.on_modified(FileModifiedEvent(str(root / ".latexignore")))
+            assert not watcher._apply_changes()
+            watcher.stop()
+
+    def test_requests_during_compilation_are_coalesced(self) -> None:
+        """Test that changes made while compiling lead to a single follow-up compilation."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            main_file = root / "main.tex"
+            main_file.write_text("main")
+
+            from watchdog.events import FileModifiedEvent
+
+            from latex_server_client.latex_watch import LatexWatcher
+
+            watcher = LatexWatcher(main_file, root, "http://localhost:9080")
+            watcher.start()
+            watcher._schedule_compile = lambda: None  # type: ignore[method-assign]
+
+            started = threading.Semaphore(0)
+            release = threading.Event()
+            compiles = []
+
+            def slow_compile():
+                compiles.append(watcher._collect_files()["main"])
+                started.release()
+                release.wait(timeout=5)
+
+            watcher._compile = slow_compile  # type: ignore[method-assign]
+
+            main_file.write_text("main changed")
+            watcher.on_modified(FileModifiedEvent(str(main_file)))
+            watcher._flush()
+            assert started.acquire(timeout=5)
+
+            # Several debounced requests while the first compilation is running
+            for i in range(3):
+                main_file.write_text(f"main {i}")
+                watcher.on_modified(FileModifiedEvent(str(main_file)))
+                watcher._flush()
+
+            release.set()
+            assert started.acquire(timeout=5)
+            time.sleep(0.1)
+
+            assert compiles == ["main changed", "main 2"]
+            watcher.stop()
+
+    def test_stop_releases_worker(self) -> None:
+        """Test that stopping the watcher ends its worker thread and frees it."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            main_file = root / "main.tex"
+            main_file.write_text("main")
+
+            from latex_server_client.latex_watch import LatexWatcher
+
+            watcher = LatexWatcher(main_file, root, "http://localhost:9080")
+            watcher.start()
+            watcher._apply_changes = lambda: True  # type: ignore[method-assign]
+            worker = watcher._worker
+
+            started = threading.Semaphore(0)
+            release = threading.Event()
+            compiles = []
+
+            def slow_compile():
+                compiles.append(len(compiles))
+                started.release()
+                release.wait(timeout=5)
+
+            watcher._compile = slow_compile  # type: ignore[method-assign]
+
+            # One compilation in flight, one queued behind it
+            watcher._flush()
+            assert started.acquire(timeout=5)
+            watcher._flush()
+
+            threading.Timer(0.1, release.set).start()
+            begin = time.monotonic()
+            watcher.stop()
+
+            # The running compilation is waited for, the queued one is dropped
+            assert time.monotonic() - begin < 2
+            assert not worker.is_alive()
+            assert compiles == [0]
+
+            # Stopping twice is harmless
+            watcher.stop()
+
+            ref = weakref.ref(watcher)
+            del watcher, worker
+            gc.collect()
+            assert ref() is None
+
+    def test_worker_survives_errors(self) -> None:
+        """Test that an error while processing changes does not kill the worker."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            main_file = root / "main.tex"
+            main_file.write_text("main")
+
+            from latex_server_client.latex_watch import LatexWatcher
+
+            watcher = LatexWatcher(main_file, root, "http://localhost:9080")
+            watcher.start()
+
+            processed = threading.Semaphore(0)
+            calls = []
+
+            def failing_apply_changes():
+                calls.append(True)
+                processed.release()
+                if len(calls) == 1:
+                    raise PermissionError("denied")
+                return False
+
+            watcher._apply_changes = failing_apply_changes  # type: ignore[method-assign]
+
+            watcher._flush()
+            assert processed.acquire(timeout=5)
+            watcher._flush()
+            assert processed.acquire(timeout=5)
+
+            assert len(calls) == 2
+            watcher.stop()
+
+    def test_failing_path_does_not_drop_other_changes(self) -> None:
+        """Test that an error on one changed path still applies the others."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            main_file = root / "main.tex"
+            main_file.write_text("main")
+
+            from watchdog.events import FileCreatedEvent
+
+            from latex_server_client.latex_watch import LatexWatcher
+
+            watcher = LatexWatcher(main_file, root, "http://localhost:9080")
+            watcher.start()
+            watcher._schedule_compile = lambda: None  # type: ignore[method-assign]
+
+            broken = root / "broken.tex"
+            refresh_path = watcher._refresh_path
+
+            def failing_refresh_path(path):
+                if path == broken:
+                    raise PermissionError("denied")
+                refresh_path(path)
+
+            watcher._refresh_path = failing_refresh_path  # type: ignore[method-assign]
+
+            for name in ("broken.tex", "a.tex", "b.tex"):
+                (root / name).write_text(name)
+                watcher.on_created(FileCreatedEvent(str(root / name)))
+
+            assert watcher._apply_changes()
+            assert set(watcher._collect_files()["files"]) == {"a.tex", "b.tex"}
+            watcher.stop()
 
     def test_collect_files_with_subdirectory(self) -> None:
         """Test file collection with subdirectories."""
@@ -265,6 +733,7 @@ class TestLatexWatcherHelpers:
             from latex_server_client.latex_watch import LatexWatcher
 
             watcher = LatexWatcher(main_file, root, "http://localhost:9080")
+            watcher.start()
 
             files = watcher._collect_files()
 
@@ -272,6 +741,34 @@ class TestLatexWatcherHelpers:
             assert "main" in files
             assert "files" in files
             assert "chapters/chapter1.tex" in files["files"] or "chapters\\chapter1.tex" in files["files"]
+            watcher.stop()
+
+    def test_collect_files_prunes_ignored_directories(self) -> None:
+        """Test that always-ignored directories are not collected."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+
+            main_file = root / "main.tex"
+            main_file.write_text("main")
+
+            git_dir = root / ".git" / "objects"
+            git_dir.mkdir(parents=True)
+            (git_dir / "pack").write_text("pack")
+
+            cache_dir = root / "chapters" / "__pycache__"
+            cache_dir.mkdir(parents=True)
+            (cache_dir / "mod.pyc").write_text("pyc")
+            (root / "chapters" / "chapter1.tex").write_text("chapter 1")
+
+            from latex_server_client.latex_watch import LatexWatcher
+
+            watcher = LatexWatcher(main_file, root, "http://localhost:9080")
+            watcher.start()
+
+            files = watcher._collect_files()
+
+            assert list(files["files"]) == [str(Path("chapters") / "chapter1.tex")]
+            watcher.stop()
 
     def test_collect_files_ignores_binary(self) -> None:
         """Test that binary files are ignored during collection."""
@@ -289,13 +786,277 @@ class TestLatexWatcherHelpers:
             from latex_server_client.latex_watch import LatexWatcher
 
             watcher = LatexWatcher(main_file, root, "http://localhost:9080")
+            watcher.start()
 
             files = watcher._collect_files()
 
             # Should only have text files
             assert "main" in files
             assert "image.png" not in files
+            watcher.stop()
+
+    def test_collect_files_detects_binary(self) -> None:
+        """Test that binary files are detected and base64 encoded."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+
+            main_file = root / "main.tex"
+            main_file.write_text("main")
+
+            # NUL byte in the first bytes
+            (root / "image.png").write_bytes(b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR")
+
+            # Invalid UTF-8 only past the sniffed prefix
+            (root / "data.dat").write_bytes(b"a" * 1024 + b"\xff\xfe")
+
+            # Text with Windows newlines and a multi-byte character
+            (root / "content.tex").write_bytes("caf\u00e9\r\nline\r\n".encode("utf-8"))
+
+            from latex_server_client.latex_watch import LatexWatcher
+
+            watcher = LatexWatcher(main_file, root, "http://localhost:9080")
+            watcher.start()
+
+            files = watcher._collect_files()["files"]
+
+            assert files["image.png"]["binary"]
+            assert base64.b64decode(files["image.png"]["data"]).startswith(b"\x89PNG")
+            assert files["data.dat"]["binary"]
+            assert files["content.tex"] == {"data": "caf\u00e9\nline\n", "binary": False}
+            watcher.stop()
+
+    def test_encode_payload_is_compact_utf8(self) -> None:
+        """Test that the request body is compact UTF-8 JSON."""
+        from latex_server_client.latex_watch import _encode_payload
+
+        files = {"main": "caf\u00e9", "files": {"a.tex": {"data": "x", "binary": False}}}
+        body = _encode_payload(files)
+
+        assert json.loads(body.decode("utf-8")) == files
+        assert body == '{"main":"caf\u00e9","files":{"a.tex":{"data":"x","binary":false}}}'.encode()
+
+    def test_write_base64_in_chunks(self) -> None:
+        """Test that base64 data is decoded to disk correctly across chunks."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            from latex_server_client.latex_watch import _write_base64
+
+            content = bytes(range(256)) * 10 + b"tail"
+            output = Path(tmpdir) / "out.pdf"
+
+            _write_base64(base64.b64encode(content).decode("ascii"), output, chunk_size=64)
+
+            assert output.read_bytes() == content
+
+            # Line-wrapped base64 (as produced by base64.encodebytes)
+            _write_base64(base64.encodebytes(content).decode("ascii"), output, chunk_size=64)
+            assert output.read_bytes() == content
+
+            # Invalid data leaves the previous file untouched
+            with pytest.raises(binascii.Error):
+                _write_base64("QUJD" * 32 + "A", output, chunk_size=64)
+            assert output.read_bytes() == content
+            assert list(Path(tmpdir).iterdir()) == [output]
+
+            with pytest.raises(ValueError):
+                _write_base64("QUJD", output, chunk_size=6)
+
+    def test_check_observer_warns_on_polling(self, caplog) -> None:
+        """Test that falling back to the polling observer is reported."""
+        from watchdog.observers.polling import PollingObserver
+
+        from latex_server_client.latex_watch import check_observer
+
+        check_observer(PollingObserver())
+
+        assert "polling" in caplog.text
+
+
+class FakeResponse:
+    """Minimal stand-in for a successful compilation server response."""
+
+    status_code = 200
+    text = ""
+
+    def __init__(self, pdf: bytes) -> None:
+        self._pdf = pdf
+
+    def json(self):
+        return {"file": base64.b64encode(self._pdf).decode("ascii"), "log": ""}
+
+
+class TestLatexWatcherCompile:
+    """Tests for LatexWatcher compilation requests."""
+
+    def test_session_is_reused(self) -> None:
+        """Test that an injected HTTP session is used for compilations."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            main_file = root / "main.tex"
+            main_file.write_text("main")
+
+            import requests
+
+            from latex_server_client.latex_watch import LatexWatcher
+
+            with requests.Session() as session:
+                watcher = LatexWatcher(main_file, root, "http://localhost:9080", session=session)
+                watcher.start()
+                assert watcher._session is session
+                watcher.stop()
+
+    def test_unchanged_project_is_not_resent(self, monkeypatch) -> None:
+        """Test that an unchanged project is not uploaded again."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            main_file = root / "main.tex"
+            main_file.write_text("main")
+
+            from latex_server_client import latex_watch
+
+            requests_sent = []
+
+            def fake_post(url, **kwargs):
+                requests_sent.append(json.loads(kwargs["data"]))
+                return FakeResponse(b"%PDF-1.5")
+
+            watcher = latex_watch.LatexWatcher(main_file, root, "http://localhost:9080")
+            watcher.start()
+            monkeypatch.setattr(watcher._session, "post", fake_post)
+
+            watcher._compile()
+            assert (root / "main.pdf").read_bytes() == b"%PDF-1.5"
+            assert len(requests_sent) == 1
+
+            # Nothing changed
+            watcher._compile()
+            assert len(requests_sent) == 1
+
+            # The PDF went missing
+            (root / "main.pdf").unlink()
+            watcher._compile()
+            assert len(requests_sent) == 2
+
+            # The main file changed
+            main_file.write_text("main changed")
+            watcher._refresh_path(main_file)
+            watcher._compile()
+            assert len(requests_sent) == 3
+            assert requests_sent[-1]["main"] == "main changed"
+            watcher.stop()
+
+    def test_failed_compilation_is_retried_on_save(self, monkeypatch) -> None:
+        """Test that saving without changes retries a compilation that failed."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            main_file = root / "main.tex"
+            main_file.write_text("main")
+
+            import requests
+            from watchdog.events import FileModifiedEvent
+
+            from latex_server_client.latex_watch import LatexWatcher
+
+            responses = [requests.exceptions.ConnectionError("down"), FakeResponse(b"%PDF")]
+
+            def fake_post(url, **kwargs):
+                response = responses.pop(0)
+                if isinstance(response, Exception):
+                    raise response
+                return response
+
+            watcher = LatexWatcher(main_file, root, "http://localhost:9080")
+            watcher.start()
+            watcher._schedule_compile = lambda: None  # type: ignore[method-assign]
+            monkeypatch.setattr(watcher._session, "post", fake_post)
+
+            main_file.write_text("main changed")
+            watcher.on_modified(FileModifiedEvent(str(main_file)))
+            assert watcher._apply_changes()
+            watcher._compile()
+            assert not (root / "main.pdf").exists()
+
+            # Saved again without changes: the failed compilation is retried
+            watcher.on_modified(FileModifiedEvent(str(main_file)))
+            assert watcher._apply_changes()
+            watcher._compile()
+            assert (root / "main.pdf").read_bytes() == b"%PDF"
+
+            # Once it succeeded, an unchanged save does not compile again
+            watcher.on_modified(FileModifiedEvent(str(main_file)))
+            assert not watcher._apply_changes()
+            watcher.stop()
+
+    def test_compressed_request(self, monkeypatch) -> None:
+        """Test that the request body is gzip-compressed when enabled."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            main_file = root / "main.tex"
+            main_file.write_text("main")
+
+            from latex_server_client.latex_watch import LatexWatcher
+
+            requests_sent = []
+
+            def fake_post(url, **kwargs):
+                requests_sent.append(kwargs)
+                return FakeResponse(b"%PDF-1.5")
+
+            watcher = LatexWatcher(main_file, root, "http://localhost:9080", compress=True)
+            watcher.start()
+            monkeypatch.setattr(watcher._session, "post", fake_post)
+
+            watcher._compile()
+
+            assert requests_sent[0]["headers"]["Content-Encoding"] == "gzip"
+            payload = json.loads(gzip.decompress(requests_sent[0]["data"]))
+            assert payload == {"main": "main", "files": {}}
+            watcher.stop()
+
+
+    def test_main_starts_observer_before_indexing(self, monkeypatch) -> None:
+        """Test that the tree is indexed and compiled only once it is being watched."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            main_file = root / "main.tex"
+            main_file.write_text("main")
+
+            import requests
+
+            from latex_server_client import latex_watch
+
+            calls = []
+
+            class FakeObserver:
+                def schedule(self, handler, path, recursive=False):
+                    calls.append("schedule")
+
+                def start(self):
+                    calls.append("observe")
+
+                def is_alive(self):
+                    return False
+
+            start = latex_watch.LatexWatcher.start
+
+            def fake_start(watcher):
+                calls.append("index")
+                start(watcher)
+
+            def fake_post(self, url, **kwargs):
+                calls.append("compile")
+                return FakeResponse(b"%PDF-1.5")
+
+            monkeypatch.setattr(latex_watch, "Observer", FakeObserver)
+            monkeypatch.setattr(latex_watch, "check_observer", lambda observer: None)
+            monkeypatch.setattr(latex_watch.LatexWatcher, "start", fake_start)
+            monkeypatch.setattr(requests.Session, "get", lambda self, url, **kwargs: FakeResponse(b""))
+            monkeypatch.setattr(requests.Session, "post", fake_post)
+            monkeypatch.setattr("sys.argv", ["latex-watch", str(main_file), "--compile-on-start"])
+
+            latex_watch.main()
+
+            assert calls == ["schedule", "observe", "index", "compile"]
 
 
 if __name__ == "__main__":
-    pytest.main([__file__, "-v"])
\ No newline at end of file
+    pytest.main([__file__, "-v"])